@@ -1,23 +1,140 @@
+import asyncio
+import atexit
+import json
+import os
+import time
+from collections import OrderedDict
+import aiohttp
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime, timedelta
+import numpy as np
 import pandas as pd
 
 # 🔹 Set your bot token and chat ID
 TELEGRAM_TOKEN = "Put Your Telegram Bot Token Here"
 TELEGRAM_CHAT_ID = "Put Your Telegram Chat ID Here"
 
+# 🔹 Shared HTTP session so alerts reuse the Keep-Alive connection to api.telegram.org
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=32))
+
+# 🔹 Max Telegram requests in flight at once (stays under the ~30 msg/s bot limit)
+MAX_CONCURRENT_ALERTS = 8
+
+# 🔹 Async HTTP pool settings (override via environment variables)
+HTTP_POOL_SIZE = int(os.environ.get("NIFTYBOT_HTTP_POOL_SIZE", 16))
+HTTP_POOL_TIMEOUT = float(os.environ.get("NIFTYBOT_HTTP_POOL_TIMEOUT", 5))
+LONG_POLL_TIMEOUT = 30  # seconds Telegram may hold a getUpdates request open
+
+# 🔹 On-disk record of alerts already sent, so repeated runs don't re-send them
+SEEN_ALERTS_FILE = os.path.join(os.path.expanduser("~"), ".niftybot", "alerts_seen.json")
+MAX_SEEN_ALERTS = 1000
+
+def _load_seen_alerts():
+    """Load the {ticker|date|signal: sent_time} cache, oldest first."""
+    try:
+        with open(SEEN_ALERTS_FILE) as f:
+            return OrderedDict(json.load(f))
+    except (OSError, ValueError):
+        return OrderedDict()
+
+def _save_seen_alerts():
+    """Persist the sent-alert cache to disk."""
+    try:
+        os.makedirs(os.path.dirname(SEEN_ALERTS_FILE), exist_ok=True)
+        with open(SEEN_ALERTS_FILE, "w") as f:
+            json.dump(list(_seen.items()), f)
+    except OSError as e:
+        print(f"⚠️ Could not save alert cache: {e}")
+
+_seen = _load_seen_alerts()
+atexit.register(_save_seen_alerts)
+
 def send_telegram_message(message):
     """Send a message to the configured Telegram chat."""
     url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
     payload = {"chat_id": TELEGRAM_CHAT_ID, "text": message}
     try:
         print(f"Sending Telegram message: {message}")  # Debug print
-        response = requests.post(url, data=payload, timeout=5)
+        response = _session.post(url, data=payload, timeout=HTTP_POOL_TIMEOUT)
         if response.status_code != 200:
             print(f"⚠️ Telegram API error: {response.text}")
     except Exception as e:
         print(f"Telegram send error: {e}")
 
+def close_alerts_session():
+    """Close the pooled Telegram HTTP session (call on shutdown)."""
+    _session.close()
+
+def _new_async_session(pool_size):
+    """Create an aiohttp session with its own keep-alive connection pool."""
+    connector = aiohttp.TCPConnector(limit=pool_size, limit_per_host=pool_size,
+                                     ttl_dns_cache=300, keepalive_timeout=75)
+    return aiohttp.ClientSession(connector=connector)
+
+async def send_async(session, message):
+    """
+    Send a message to the configured Telegram chat over an aiohttp session.
+    Returns True if Telegram accepted it (HTTP 200), False otherwise.
+    """
+    url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
+    payload = {"chat_id": TELEGRAM_CHAT_ID, "text": message}
+    try:
+        async with session.post(url, data=payload,
+                                timeout=aiohttp.ClientTimeout(total=HTTP_POOL_TIMEOUT)) as response:
+            if response.status != 200:
+                print(f"⚠️ Telegram API error: {await response.text()}")
+                return False
+            return True
+    except Exception as e:
+        print(f"Telegram send error: {e}")
+        return False
+
+async def _send_many(messages):
+    """
+    Send a batch of messages concurrently, at most MAX_CONCURRENT_ALERTS in flight.
+    Returns a list of delivery flags, one per message, in the same order.
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_ALERTS)
+
+    async with _new_async_session(HTTP_POOL_SIZE) as session:
+        async def bounded_post(message):
+            async with semaphore:
+                return await send_async(session, message)
+
+        return await asyncio.gather(*[bounded_post(m) for m in messages])
+
+def new_updates_session():
+    """
+    Create a single-connection aiohttp session for get_updates().
+    Kept apart from the alert send pool so a held-open poll never blocks outgoing alerts.
+    """
+    return _new_async_session(1)
+
+async def get_updates(session, offset=None, timeout=LONG_POLL_TIMEOUT):
+    """
+    Long-poll Telegram's getUpdates for incoming messages.
+    `session` should be a dedicated receive session (see new_updates_session()),
+    not one shared with sends.
+    Returns the list of update dicts (empty on timeout or error).
+    """
+    url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/getUpdates"
+    params = {"timeout": timeout}
+    if offset is not None:
+        params["offset"] = offset
+    try:
+        async with session.get(url, params=params,
+                               timeout=aiohttp.ClientTimeout(total=timeout + HTTP_POOL_TIMEOUT)) as response:
+            if response.status != 200:
+                print(f"⚠️ Telegram API error: {await response.text()}")
+                return []
+            data = await response.json()
+            return data.get("result", [])
+    except Exception as e:
+        print(f"Telegram getUpdates error: {e}")
+        return []
+
 def send_trade_alerts(data_dict, lookback_days=1):
     """
     Sends Telegram alerts for all BUY/SELL signals within the last `lookback_days`.
@@ -31,19 +148,43 @@ def send_trade_alerts(data_dict, lookback_days=1):
     # 📢 Send a startup test alert
     send_telegram_message("✅ Bot started successfully — monitoring for trade signals...")
 
+    pending = []  # (dedup key, message) pairs not yet delivered
     for ticker, df in data_dict.items():
         # Ensure index is datetime
         if not isinstance(df.index, pd.DatetimeIndex):
             df.index = pd.to_datetime(df.index, errors="coerce")
 
-        # Filter for recent signals (BUY=1, SELL=-1)
-        recent_signals = df[(df["Signal"] != 0) & (df.index >= cutoff_date)]
+        # Filter for recent signals (BUY=1, SELL=-1), keeping only the columns alerts use
+        recent = df.loc[df.index >= cutoff_date, ["Signal", "Close"]]
+        recent_signals = recent[recent["Signal"] != 0]
+
+        if recent_signals.empty:
+            continue
+
+        # Extract columns once, then build messages from plain arrays
+        signal_types = np.where(recent_signals["Signal"].to_numpy() == 1, "BUY", "SELL")
+        prices = recent_signals["Close"].to_numpy(dtype=float)
+        dates = recent_signals.index.strftime("%Y-%m-%d")
+
+        for signal_type, price, date in zip(signal_types, prices, dates):
+            # Skip alerts already sent on a previous run
+            key = f"{ticker}|{date}|{signal_type}"
+            if key in _seen:
+                continue
 
-        for date, row in recent_signals.iterrows():
-            signal_type = "BUY" if row["Signal"] == 1 else "SELL"
             emoji = "📈" if signal_type == "BUY" else "📉"
-            price = f"{row['Close']:.2f}"
-            message = f"{emoji} {signal_type} for {ticker} at ₹{price} on {date.strftime('%Y-%m-%d')}"
-            
+            message = f"{emoji} {signal_type} for {ticker} at ₹{price:.2f} on {date}"
             print(f"Preparing to send alert: {message}")
-            send_telegram_message(message)
+            pending.append((key, message))
+
+    # 🚀 Dispatch all alerts concurrently
+    if not pending:
+        return
+    delivered = asyncio.run(_send_many([message for _, message in pending]))
+
+    # Only remember alerts Telegram accepted, so failed ones are retried next run
+    for (key, _), ok in zip(pending, delivered):
+        if ok:
+            _seen[key] = time.time()
+            if len(_seen) > MAX_SEEN_ALERTS:
+                _seen.popitem(last=False)
@@ -4,7 +4,7 @@ Backtesting utilities for NiftyBot.
 
 Provides:
 - backtest(df, initial_capital=100000) -> (trades_df, summary_dict)
-- backtest_all(data_dict, initial_capital=100000, months=6) -> (results_dict, summaries_dict)
+- backtest_all(data_dict, initial_capital=100000, months=6, max_workers=None, interval="1d") -> (results_dict, summaries_dict)
 
 Execution rules:
 - Buy/Sell executions happen at the NEXT trading day's Open (if available), otherwise NEXT Close.
@@ -13,49 +13,116 @@ Execution rules:
 
 import pandas as pd
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 import numpy as np
+from numba import njit
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
+TRADING_DAYS_PER_MONTH = 21
+
 
 def _ensure_datetime_index(df):
-    """Ensure the DataFrame has a DateTimeIndex and is sorted ascending."""
-    df = df.copy()
+    """
+    Ensure the DataFrame has a DateTimeIndex and is sorted ascending.
+    Returns the input unchanged (no copy) when it already satisfies both.
+    """
     if "Date" in df.columns:
-        df["Date"] = pd.to_datetime(df["Date"])
-        df.set_index("Date", inplace=True)
-    else:
+        df = df.set_index("Date")
+        df.index = pd.to_datetime(df.index)
+    elif not isinstance(df.index, pd.DatetimeIndex):
         # If index isn't datetime, try to convert
-        if not isinstance(df.index, pd.DatetimeIndex):
-            try:
-                df.index = pd.to_datetime(df.index)
-            except Exception:
-                pass
-    df = df.sort_index()
+        try:
+            df = df.set_axis(pd.to_datetime(df.index))
+        except Exception:
+            pass
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index()
     return df
 
 
 def _normalize_signal(val):
-    """Normalize signal values to 'BUY'/'SELL'/'HOLD'."""
-    if pd.isna(val):
-        return "HOLD"
-    if isinstance(val, (int, float, np.integer, np.floating)):
-        try:
-            v = int(val)
-            if v == 1:
-                return "BUY"
-            if v == -1:
-                return "SELL"
-            return "HOLD"
-        except Exception:
-            return "HOLD"
-    s = str(val).strip().upper()
-    if s in ("BUY", "B", "1"):
-        return "BUY"
-    if s in ("SELL", "S", "-1"):
-        return "SELL"
-    return "HOLD"
+    """Normalize a numeric signal value to 1 (BUY), -1 (SELL) or 0 (HOLD)."""
+    try:
+        v = int(val)
+    except (TypeError, ValueError, OverflowError):
+        return 0
+    return v if v in (1, -1) else 0
+
+
+# Signal values mapped straight to 1 (BUY) / -1 (SELL) / 0 (HOLD).
+# String labels are only kept so signal files saved by older versions still load.
+_SIGNAL_CODES = {
+    1: 1, -1: -1, 0: 0,
+    "BUY": 1, "SELL": -1, "HOLD": 0,
+}
+
+
+def _signal_array(signals):
+    """Convert a Signal column to an int8 array of 1 (BUY), -1 (SELL) or 0 (HOLD)."""
+    if signals.dtype == np.int8:
+        # already int8 from apply_strategy(): no lookup needed
+        vals = signals.to_numpy()
+        return np.where((vals == 1) | (vals == -1), vals, 0).astype(np.int8)
+    codes = signals.map(_SIGNAL_CODES)
+    # rare values outside the lookup table (e.g. 1.5) go through the slow path once
+    unmatched = codes.isna() & signals.notna()
+    if unmatched.any():
+        codes[unmatched] = signals[unmatched].map(_normalize_signal)
+    return codes.fillna(0).to_numpy(dtype=np.int8)
+
+
+@njit(cache=True)
+def _run_backtest_core(sig, exec_px, last_price, initial_capital):
+    """
+    Long-only state machine over plain arrays (compiled with Numba).
+    sig[i] is 1/-1/0 for row i and exec_px[i] the price it executes at (row i+1).
+
+    Returns preallocated trade arrays plus the number of completed trades
+    and the final capital:
+      (entry_idx, exit_idx, entry_px, exit_px, qty, n_trades, capital)
+    """
+    n = len(sig)
+    max_trades = n // 2 + 1
+    entry_idx = np.zeros(max_trades, dtype=np.int64)
+    exit_idx = np.zeros(max_trades, dtype=np.int64)
+    entry_px = np.zeros(max_trades)
+    exit_px = np.zeros(max_trades)
+    qty = np.zeros(max_trades)
+    n_trades = 0
+
+    in_position = False
+    capital = initial_capital
+
+    # execute each signal at the next row's price
+    for i in range(n - 1):
+        price = exec_px[i]
+        if np.isnan(price):
+            continue  # cannot execute without price
+
+        if sig[i] == 1 and not in_position:
+            entry_idx[n_trades] = i + 1
+            entry_px[n_trades] = price
+            qty[n_trades] = capital / price if price > 0 else 0.0
+            in_position = True
+
+        elif sig[i] == -1 and in_position:
+            exit_idx[n_trades] = i + 1
+            exit_px[n_trades] = price
+            capital = qty[n_trades] * price
+            n_trades += 1
+            in_position = False
+
+    # If still in position at the end, close at last available price
+    if in_position and not np.isnan(last_price):
+        exit_idx[n_trades] = n - 1
+        exit_px[n_trades] = last_price
+        capital = qty[n_trades] * last_price
+        n_trades += 1
+
+    return entry_idx, exit_idx, entry_px, exit_px, qty, n_trades, capital
 
 
 def backtest(df, initial_capital=100000):
@@ -85,100 +152,25 @@ def backtest(df, initial_capital=100000):
     # ensure numeric prices
     if "Open" not in df.columns:
         logging.warning("No 'Open' column present, will use 'Close' for execution.")
-    for col in ("Open", "Close"):
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-
-    trades = []
-    in_position = False
-    entry_price = None
-    entry_qty = None
-    capital = float(initial_capital)
-    idx = df.index.to_list()
-
-    # iterate over rows but execute at next row's price
-    for i in range(len(df) - 1):
-        sig = _normalize_signal(df["Signal"].iloc[i])
-        next_row = df.iloc[i + 1]
-        exec_price = None
-        if "Open" in df.columns and not pd.isna(next_row.get("Open")):
-            exec_price = float(next_row["Open"])
-        elif "Close" in df.columns and not pd.isna(next_row.get("Close")):
-            exec_price = float(next_row["Close"])
-        else:
-            continue  # cannot execute without price
-
-        exec_date = idx[i + 1]
+    n = len(df)
+    nan_col = np.full(n, np.nan)
+    op = pd.to_numeric(df["Open"], errors="coerce").to_numpy(dtype=float) if "Open" in df.columns else nan_col
+    cl = pd.to_numeric(df["Close"], errors="coerce").to_numpy(dtype=float) if "Close" in df.columns else nan_col
+    sig = _signal_array(df["Signal"])
 
-        if sig == "BUY" and not in_position:
-            entry_price = exec_price
-            entry_qty = capital / entry_price if entry_price > 0 else 0
-            in_position = True
-            trades.append({
-                "Entry Date": exec_date,
-                "Entry Price": entry_price,
-                "Exit Date": pd.NaT,
-                "Exit Price": np.nan,
-                "Qty": entry_qty,
-                "P&L": np.nan
-            })
-
-        elif sig == "SELL" and in_position:
-            exit_price = exec_price
-            exit_date = exec_date
-            pnl = (exit_price - entry_price) * entry_qty
-            capital = entry_qty * exit_price
-            trades[-1].update({
-                "Exit Date": exit_date,
-                "Exit Price": exit_price,
-                "P&L": pnl
-            })
-            in_position = False
-            entry_price = None
-            entry_qty = None
+    # execution price for a signal on row i is row i+1's Open, else its Close
+    exec_px = np.where(np.isnan(op[1:]), cl[1:], op[1:])
 
-    # If still in position at the end, close at last available price
-    if in_position:
-        last_price = None
-        last_date = idx[-1]
-        last_row = df.iloc[-1]
-        if "Close" in df.columns and not pd.isna(last_row.get("Close")):
-            last_price = float(last_row["Close"])
-        elif "Open" in df.columns and not pd.isna(last_row.get("Open")):
-            last_price = float(last_row["Open"])
-
-        if last_price is not None:
-            pnl = (last_price - entry_price) * entry_qty
-            capital = entry_qty * last_price
-            trades[-1].update({
-                "Exit Date": last_date,
-                "Exit Price": last_price,
-                "P&L": pnl
-            })
-        in_position = False
-
-    # Build trades DataFrame
-    trades_df = pd.DataFrame(trades)
-
-    # Handle case: no trades at all
-    if trades_df.empty:
-        return trades_df, {
-            "Final Capital": float(capital),
-            "Total Trades": 0,
-            "Wins": 0,
-            "Win Ratio (%)": 0.0,
-            "Total P&L": 0.0,
-            "Return (%)": round(((capital - initial_capital) / initial_capital) * 100, 2)
-        }
+    # last available price, used to close a position still open at the end
+    last_price = cl[-1] if not np.isnan(cl[-1]) else op[-1]
 
-    # Filter completed trades only
-    if "Exit Date" not in trades_df.columns:
-        trades_df["Exit Date"] = pd.NaT
-    completed = trades_df.dropna(subset=["Exit Date"]).copy()
+    entry_idx, exit_idx, entry_px, exit_px, qty, n_trades, capital = _run_backtest_core(
+        sig, exec_px, last_price, float(initial_capital)
+    )
 
     # If no completed trades, return zero summary
-    if completed.empty:
-        return completed.reset_index(drop=True), {
+    if n_trades == 0:
+        return pd.DataFrame(), {
             "Final Capital": float(capital),
             "Total Trades": 0,
             "Wins": 0,
@@ -187,8 +179,16 @@ def backtest(df, initial_capital=100000):
             "Return (%)": round(((capital - initial_capital) / initial_capital) * 100, 2)
         }
 
-    # Ensure P&L numeric
-    completed["P&L"] = pd.to_numeric(completed["P&L"], errors="coerce").fillna(0.0)
+    # Build trades DataFrame from the filled part of the arrays
+    entry_px, exit_px, qty = entry_px[:n_trades], exit_px[:n_trades], qty[:n_trades]
+    completed = pd.DataFrame({
+        "Entry Date": df.index[entry_idx[:n_trades]],
+        "Entry Price": entry_px,
+        "Exit Date": df.index[exit_idx[:n_trades]],
+        "Exit Price": exit_px,
+        "Qty": qty,
+        "P&L": (exit_px - entry_px) * qty
+    })
 
     # Summaries
     total_trades = len(completed)
@@ -209,13 +209,63 @@ def backtest(df, initial_capital=100000):
     return completed.reset_index(drop=True), summary
 
 
-def backtest_all(data_dict, initial_capital=100000, months=6):
+def _empty_summary(initial_capital):
+    """Summary for a ticker that could not be backtested."""
+    return {
+        "Final Capital": float(initial_capital),
+        "Total Trades": 0,
+        "Wins": 0,
+        "Win Ratio (%)": 0.0,
+        "Total P&L": 0.0,
+        "Return (%)": 0.0
+    }
+
+
+def _backtest_window(df, months, interval="1d"):
     """
-    Run backtest for multiple tickers.
+    Return the last `months` of df (with a sorted DateTimeIndex), or None if df is empty.
+    Runs in the parent so only the window is sent to a worker process.
+    """
+    df_local = _ensure_datetime_index(df)
+    if len(df_local) == 0:
+        return None
+    if interval == "1d":
+        # daily bars: take the last months * 21 trading days by position
+        # (clamped start: iloc[-0:] would return the whole history for months=0)
+        return df_local.iloc[max(len(df_local) - months * TRADING_DAYS_PER_MONTH, 0):]
+    last_date = df_local.index.max()
+    start_date = last_date - pd.DateOffset(months=months)
+    return df_local.loc[start_date:last_date]
+
+
+def _backtest_one(ticker, df_slice, initial_capital):
+    """
+    Backtest one ticker's already-sliced window (runs in a worker process).
+    Returns (trades_df, summary).
+    """
+    try:
+        if df_slice.empty or "Signal" not in df_slice.columns:
+            logging.warning(f"⚠ No valid slice or 'Signal' column for {ticker}. Skipping...")
+            return pd.DataFrame(), _empty_summary(initial_capital)
+
+        trades_df, summary = backtest(df_slice, initial_capital=initial_capital)
+        logging.info(f"📊 {ticker} - Final Value: ₹{summary['Final Capital']:.2f} | Return: {summary['Return (%)']:.2f}% | Trades: {summary['Total Trades']}")
+        return trades_df, summary
+
+    except Exception as e:
+        logging.error(f"❌ Error backtesting {ticker}: {e}")
+        return pd.DataFrame(), _empty_summary(initial_capital)
+
+
+def backtest_all(data_dict, initial_capital=100000, months=6, max_workers=None, interval="1d"):
+    """
+    Run backtest for multiple tickers, one worker process per ticker.
     Inputs:
       data_dict: { ticker: DataFrame(with signals) }
       initial_capital: money allocated per ticker (default 100,000)
       months: how many months to backtest (slices last 'months' months of each df)
+      max_workers: number of worker processes (default: min(number of tickers, os.cpu_count()))
+      interval: bar size of the data; "1d" slices by trading-day count, others by calendar months
     Returns:
       results: dict mapping ticker -> trades_df
       summaries: dict mapping ticker -> summary dict
@@ -223,67 +273,53 @@ def backtest_all(data_dict, initial_capital=100000, months=6):
     results = {}
     summaries = {}
 
+    # slice in the parent so workers only receive the backtest window
+    windows = {}
     for ticker, df in data_dict.items():
+        logging.info(f"🔄 Backtesting {ticker} (last {months} months)...")
         try:
-            logging.info(f"🔄 Backtesting {ticker} (last {months} months)...")
-            df_local = _ensure_datetime_index(df)
-
-            # slice to last `months` using the last available date in df
-            if len(df_local) == 0:
-                logging.warning(f"No data for {ticker}. Skipping.")
-                continue
-            last_date = df_local.index.max()
-            start_date = last_date - pd.DateOffset(months=months)
-            df_slice = df_local.loc[start_date:last_date].copy()
-
-            if df_slice.empty or "Signal" not in df_slice.columns:
-                logging.warning(f"⚠ No valid slice or 'Signal' column for {ticker}. Skipping...")
-                results[ticker] = pd.DataFrame()
-                summaries[ticker] = {
-                    "Final Capital": float(initial_capital),
-                    "Total Trades": 0,
-                    "Wins": 0,
-                    "Win Ratio (%)": 0.0,
-                    "Total P&L": 0.0,
-                    "Return (%)": 0.0
-                }
-                continue
-
-            trades_df, summary = backtest(df_slice, initial_capital=initial_capital)
-            results[ticker] = trades_df
-            summaries[ticker] = summary
-
-            logging.info(f"📊 {ticker} - Final Value: ₹{summary['Final Capital']:.2f} | Return: {summary['Return (%)']:.2f}% | Trades: {summary['Total Trades']}")
-
+            df_slice = _backtest_window(df, months, interval)
         except Exception as e:
             logging.error(f"❌ Error backtesting {ticker}: {e}")
-            results[ticker] = pd.DataFrame()
-            summaries[ticker] = {
-                "Final Capital": float(initial_capital),
-                "Total Trades": 0,
-                "Wins": 0,
-                "Win Ratio (%)": 0.0,
-                "Total P&L": 0.0,
-                "Return (%)": 0.0
-            }
+            results[ticker], summaries[ticker] = pd.DataFrame(), _empty_summary(initial_capital)
+            continue
+        if df_slice is None:
+            logging.warning(f"No data for {ticker}. Skipping.")
+            continue
+        windows[ticker] = df_slice
+
+    if not windows:
+        return results, summaries
+
+    # fork start: every worker is spawned up front, so don't start more than there are tickers
+    workers = max_workers or min(len(windows), os.cpu_count())
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        futures = {
+            ticker: ex.submit(_backtest_one, ticker, df_slice, initial_capital)
+            for ticker, df_slice in windows.items()
+        }
+        for ticker, future in futures.items():
+            try:
+                results[ticker], summaries[ticker] = future.result()
+            except Exception as e:
+                logging.error(f"❌ Error backtesting {ticker}: {e}")
+                results[ticker], summaries[ticker] = pd.DataFrame(), _empty_summary(initial_capital)
 
-    return results, summaries
+    # keep results in data_dict order
+    order = [t for t in data_dict if t in results]
+    return {t: results[t] for t in order}, {t: summaries[t] for t in order}
 
 
 if __name__ == "__main__":
-    # Quick CLI test: load the signals file if present
+    # Quick CLI test: load the signals saved by strategy.py if present
+    from data_fetcher import load_parquet_dir
+
     try:
-        logging.info("📂 Loading strategy output from nifty_data_with_signals.xlsx ...")
-        data_dict = pd.read_excel("nifty_data_with_signals.xlsx", sheet_name=None)
-        # ensure 'Date' column becomes index for each sheet
-        for t, df in data_dict.items():
-            if "Date" in df.columns:
-                df["Date"] = pd.to_datetime(df["Date"])
-                df.set_index("Date", inplace=True)
-            data_dict[t] = df
+        logging.info("📂 Loading strategy output from data/signals/ ...")
+        data_dict = load_parquet_dir("data/signals")
 
         results, summaries = backtest_all(data_dict)
         for t in summaries:
             logging.info(f"{t} summary: {summaries[t]}")
     except FileNotFoundError:
-        logging.error("nifty_data_with_signals.xlsx not found. Run strategy.py first to create it.")
+        logging.error("data/signals/ not found. Run strategy.py first to create it.")
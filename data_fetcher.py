@@ -1,13 +1,13 @@
 """
-data_fetcher.py - Fetch NSE stock data using yfinance or load from local Excel
+data_fetcher.py - Fetch NSE stock data using yfinance or load from local Parquet/Excel
 """
 
 import pandas as pd
 import logging
-import yfinance as yf
 from config import TICKERS, DATA_PERIOD, DATA_INTERVAL
 from datetime import datetime, timedelta
 import os
+import json
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
@@ -39,6 +39,8 @@ def fetch_data_yf(ticker, start_date, end_date, interval=DATA_INTERVAL):
     """
     Fetch historical OHLCV data for a single NSE ticker using yfinance.
     """
+    import yfinance as yf  # imported on demand so local-data runs skip it
+
     try:
         logging.info(f"📈 Fetching {ticker} from Yahoo Finance {start_date.date()} → {end_date.date()}...")
         df = yf.download(ticker, start=start_date, end=end_date, interval=interval)
@@ -56,15 +58,96 @@ def fetch_data_yf(ticker, start_date, end_date, interval=DATA_INTERVAL):
         return pd.DataFrame()
 
 
-def fetch_all_data(tickers=None, period=DATA_PERIOD, interval=DATA_INTERVAL, use_local=False, local_file="nifty_data.xlsx"):
+def fetch_many_yf(tickers, start_date, end_date, interval=DATA_INTERVAL):
     """
-    Fetch data for all tickers using yfinance or load from local Excel.
-    If use_local=True, load pre-saved data from Excel file.
+    Fetch OHLCV data for many tickers in one threaded yfinance download.
+    Returns {ticker: DataFrame}, skipping tickers with no data.
+    """
+    import yfinance as yf  # imported on demand so local-data runs skip it
+
+    try:
+        logging.info(f"📈 Fetching {len(tickers)} tickers from Yahoo Finance {start_date.date()} → {end_date.date()}...")
+        df_all = yf.download(tickers=" ".join(tickers), start=start_date, end=end_date,
+                             interval=interval, group_by="ticker", threads=True, progress=False)
+    except Exception as e:
+        logging.error(f"❌ Failed to fetch tickers: {e}")
+        return {}
+
+    all_data = {}
+    fetched = set(df_all.columns.get_level_values(0)) if not df_all.empty else set()
+    for ticker in tickers:
+        df = df_all[ticker].dropna() if ticker in fetched else pd.DataFrame()
+        if df.empty:
+            logging.warning(f"No data returned for {ticker}")
+            continue
+        all_data[ticker] = df
+        logging.info(f"✅ Data fetched for {ticker} ({len(df)} rows)")
+    return all_data
+
+
+PARQUET_MANIFEST = "tickers.json"
+
+
+def save_parquet_dir(data_dict, directory, compression="zstd"):
+    """
+    Save {ticker: DataFrame} as one Parquet file per ticker: directory/{ticker}.parquet
+    A tickers.json manifest records the tickers in their original order.
+    """
+    os.makedirs(directory, exist_ok=True)
+    for ticker, df in data_dict.items():
+        df.to_parquet(os.path.join(directory, f"{ticker}.parquet"), engine="pyarrow", compression=compression)
+    # written last, so its mtime marks when the cache was completed
+    with open(os.path.join(directory, PARQUET_MANIFEST), "w") as f:
+        json.dump(list(data_dict), f)
+    logging.info(f"💾 Saved {len(data_dict)} tickers to {directory}/")
+
+
+def load_parquet_dir(directory):
+    """
+    Load directory/{ticker}.parquet files into {ticker: DataFrame}, in the order
+    listed by the tickers.json manifest (alphabetical if there is none).
+    """
+    manifest = os.path.join(directory, PARQUET_MANIFEST)
+    if os.path.exists(manifest):
+        with open(manifest) as f:
+            tickers = json.load(f)
+    else:
+        tickers = sorted(name[:-len(".parquet")] for name in os.listdir(directory) if name.endswith(".parquet"))
+
+    all_data = {}
+    for ticker in tickers:
+        all_data[ticker] = pd.read_parquet(os.path.join(directory, f"{ticker}.parquet"), engine="pyarrow")
+        logging.info(f"✅ Loaded {ticker} ({len(all_data[ticker])} rows) from {directory}/")
+    return all_data
+
+
+def _parquet_cache_is_fresh(cache_dir, source_file):
+    """True if cache_dir holds a complete cache at least as new as source_file."""
+    manifest = os.path.join(cache_dir, PARQUET_MANIFEST)
+    if not os.path.exists(manifest):
+        return False
+    if not os.path.exists(source_file):
+        return True  # nothing newer to rebuild from
+    return os.path.getmtime(manifest) >= os.path.getmtime(source_file)
+
+
+def fetch_all_data(tickers=None, period=DATA_PERIOD, interval=DATA_INTERVAL, use_local=False,
+                   local_file="nifty_data.xlsx", local_dir="data"):
+    """
+    Fetch data for all tickers using yfinance or load from local files.
+    If use_local=True, load pre-saved data from the Parquet cache for `local_file`
+    (local_dir/<file stem>/), rebuilding it from the Excel file whenever the
+    workbook is newer than the cache.
     """
     if tickers is None:
         tickers = TICKERS
 
     if use_local:
+        cache_dir = os.path.join(local_dir, os.path.splitext(os.path.basename(local_file))[0])
+        if _parquet_cache_is_fresh(cache_dir, local_file):
+            logging.info(f"📂 Loading local dataset from {cache_dir}/ ...")
+            return load_parquet_dir(cache_dir)
+
         if not os.path.exists(local_file):
             logging.error(f"❌ Local file {local_file} not found.")
             return {}
@@ -83,16 +166,13 @@ def fetch_all_data(tickers=None, period=DATA_PERIOD, interval=DATA_INTERVAL, use
 
             all_data[sheet] = df
             logging.info(f"✅ Loaded {sheet} ({len(df)} rows) from local file.")
+
+        save_parquet_dir(all_data, cache_dir)
         return all_data
 
     else:
         start_date, end_date = period_to_dates(period)
-        all_data = {}
-        for ticker in tickers:
-            df = fetch_data_yf(ticker, start_date, end_date, interval)
-            if not df.empty:
-                all_data[ticker] = df
-        return all_data
+        return fetch_many_yf(tickers, start_date, end_date, interval)
 
 
 if __name__ == "__main__":
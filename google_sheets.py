@@ -14,13 +14,27 @@ from config import (
 )
 
 
+_client = None
+_workbook = None
+
+
 def get_gsheets_client():
-    """Authenticate and return gspread client."""
-    scope = ["https://spreadsheets.google.com/feeds",
-             "https://www.googleapis.com/auth/drive"]
-    creds = ServiceAccountCredentials.from_json_keyfile_name(GOOGLE_CREDENTIALS_FILE, scope)
-    client = gspread.authorize(creds)
-    return client
+    """Authenticate once and return the cached gspread client."""
+    global _client
+    if _client is None:
+        scope = ["https://spreadsheets.google.com/feeds",
+                 "https://www.googleapis.com/auth/drive"]
+        creds = ServiceAccountCredentials.from_json_keyfile_name(GOOGLE_CREDENTIALS_FILE, scope)
+        _client = gspread.authorize(creds)
+    return _client
+
+
+def get_workbook():
+    """Open GOOGLE_SHEET_NAME once and return the cached spreadsheet handle."""
+    global _workbook
+    if _workbook is None:
+        _workbook = get_gsheets_client().open(GOOGLE_SHEET_NAME)
+    return _workbook
 
 
 def write_dataframe_to_sheet(df, sheet_name):
@@ -28,15 +42,18 @@ def write_dataframe_to_sheet(df, sheet_name):
     Writes a pandas DataFrame to a specific Google Sheets tab.
     Overwrites existing content.
     """
-    client = get_gsheets_client()
-    sheet = client.open(GOOGLE_SHEET_NAME).worksheet(sheet_name)
+    spreadsheet = get_workbook()
+    sheet_range = f"'{sheet_name}'"
 
     # Clear the sheet before writing
-    sheet.clear()
+    spreadsheet.values_batch_clear(body={"ranges": [sheet_range]})
 
-    # Convert DataFrame to list of lists
+    # Convert DataFrame to list of lists and write it in a single batch request
     data = [df.columns.tolist()] + df.values.tolist()
-    sheet.update("A1", data)
+    spreadsheet.values_batch_update({
+        "valueInputOption": "RAW",
+        "data": [{"range": f"{sheet_range}!A1", "values": data}]
+    })
 
 
 def log_trade_data(trade_data_dict):
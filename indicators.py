@@ -4,7 +4,6 @@
 
 import pandas as pd
 import logging
-import ta  # pip install ta
 
 # Indicator settings
 RSI_WINDOW = 14
@@ -15,57 +14,121 @@ MACD_SLOW = 26
 MACD_SIGNAL = 9
 
 
-def add_indicators(df):
-    """
-    Add RSI, moving averages, and MACD to the DataFrame.
-    Assumes DataFrame has columns: Date, Open, High, Low, Close, Volume
-    """
+def _per_group(result, by):
+    """Drop the extra group level that groupby().rolling()/ewm() prepends."""
+    return result if by is None else result.reset_index(level=0, drop=True)
 
-    # Ensure datetime index for consistency
-    if 'Date' in df.columns:
-        df['Date'] = pd.to_datetime(df['Date'])
-        df.set_index('Date', inplace=True)
 
+def _ewm(series, by=None, **kwargs):
+    """series.ewm(...).mean(), computed independently per `by` index level if given."""
+    target = series if by is None else series.groupby(level=by, sort=False)
+    return _per_group(target.ewm(**kwargs).mean(), by)
+
+
+def _sma(series, window, by=None):
+    """Simple moving average, computed independently per `by` index level if given."""
+    target = series if by is None else series.groupby(level=by, sort=False)
+    return _per_group(target.rolling(window=window).mean(), by)
+
+
+def _ema(series, span, by=None):
+    """Exponential moving average (same convention as ta: adjust=False, min_periods=span)."""
+    return _ewm(series, by, span=span, min_periods=span, adjust=False)
+
+
+def _rsi(close, window=RSI_WINDOW, by=None):
+    """Wilder's RSI computed with vectorized pandas ewm."""
+    delta = (close.diff() if by is None else close.groupby(level=by, sort=False).diff()).fillna(0.0)
+    up = _ewm(delta.clip(lower=0), by, alpha=1 / window, min_periods=window, adjust=False)
+    down = _ewm(-delta.clip(upper=0), by, alpha=1 / window, min_periods=window, adjust=False)
+    rsi = 100 - 100 / (1 + up / down)
+    # no losses in the window -> RSI is 100
+    return rsi.where(down != 0, 100.0).where(down.notna())
+
+
+def _compute_indicators(df, by=None):
+    """Write RSI, SMA and MACD columns into df (per `by` index level if given)."""
     # RSI
-    df['RSI'] = ta.momentum.RSIIndicator(
-        close=df['Close'],
-        window=RSI_WINDOW
-    ).rsi()
+    df['RSI'] = _rsi(df['Close'], RSI_WINDOW, by)
 
     # Moving averages
-    df['SMA20'] = df['Close'].rolling(window=SMA_FAST).mean()
-    df['SMA50'] = df['Close'].rolling(window=SMA_SLOW).mean()
+    df['SMA20'] = _sma(df['Close'], SMA_FAST, by)
+    df['SMA50'] = _sma(df['Close'], SMA_SLOW, by)
 
     # MACD
-    macd_indicator = ta.trend.MACD(
-        close=df['Close'],
-        window_slow=MACD_SLOW,
-        window_fast=MACD_FAST,
-        window_sign=MACD_SIGNAL
-    )
-    df['MACD'] = macd_indicator.macd()
-    df['MACD_SIGNAL'] = macd_indicator.macd_signal()
-    df['MACD_HIST'] = macd_indicator.macd_diff()
+    df['MACD'] = _ema(df['Close'], MACD_FAST, by) - _ema(df['Close'], MACD_SLOW, by)
+    df['MACD_SIGNAL'] = _ema(df['MACD'], MACD_SIGNAL, by)
+    df['MACD_HIST'] = df['MACD'] - df['MACD_SIGNAL']
 
     df.dropna(inplace=True)  # remove rows with NaN from indicators
     return df
 
 
-def add_indicators_to_all(data_dict):
+def add_indicators(df):
     """
-    Apply add_indicators() to a dictionary of {ticker: DataFrame}
+    Add RSI, moving averages, and MACD to the DataFrame.
+    Assumes DataFrame has columns: Date, Open, High, Low, Close, Volume
     """
+
+    # Ensure datetime index for consistency
+    if 'Date' in df.columns:
+        df['Date'] = pd.to_datetime(df['Date'])
+        df.set_index('Date', inplace=True)
+
+    return _compute_indicators(df)
+
+
+def _add_indicators_each(data_dict):
+    """Apply add_indicators() ticker by ticker, skipping tickers that fail."""
     result = {}
     for ticker, df in data_dict.items():
         try:
             logging.info(f"📊 Adding indicators for {ticker}...")
-            result[ticker] = add_indicators(df.copy())
+            result[ticker] = add_indicators(df.copy(deep=False))  # shallow: new columns don't touch the input
             logging.info(f"✅ Indicators added for {ticker} ({len(result[ticker])} rows)")
         except Exception as e:
             logging.error(f"❌ Failed to add indicators for {ticker}: {e}")
     return result
 
 
+def add_indicators_to_all(data_dict):
+    """
+    Add indicators to a dictionary of {ticker: DataFrame}.
+    All tickers are stacked into one tall frame so each indicator is a single
+    grouped pandas call; falls back to per-ticker processing if the tickers
+    have different columns or the batched pass fails.
+    """
+    if not data_dict:
+        return {}
+
+    try:
+        logging.info(f"📊 Adding indicators for {len(data_dict)} tickers...")
+        frames = {}
+        for ticker, df in data_dict.items():
+            if 'Date' in df.columns:
+                df = df.assign(Date=pd.to_datetime(df['Date'])).set_index('Date')
+            frames[ticker] = df
+
+        # Stacking aligns columns, so a ticker missing another's extra column (e.g. 'Adj Close')
+        # would get NaNs there and lose every row in dropna -- only batch identical layouts.
+        if len({tuple(df.columns) for df in frames.values()}) > 1:
+            logging.info("ℹ️ Tickers have different columns, processing them one by one...")
+            return _add_indicators_each(data_dict)
+
+        big = _compute_indicators(pd.concat(frames, names=['ticker']), by='ticker')
+
+        result = {}
+        present = big.index.get_level_values('ticker')
+        for ticker in data_dict:
+            result[ticker] = big.xs(ticker, level='ticker') if ticker in present else big.iloc[:0].droplevel('ticker')
+            logging.info(f"✅ Indicators added for {ticker} ({len(result[ticker])} rows)")
+        return result
+
+    except Exception as e:
+        logging.warning(f"⚠️ Batched indicators failed ({e}), processing tickers one by one...")
+        return _add_indicators_each(data_dict)
+
+
 if __name__ == "__main__":
     # Quick test with dummy file
     dummy = pd.read_excel("nifty_data.xlsx", sheet_name="RELIANCE.NS")
@@ -5,15 +5,16 @@ Main orchestrator for NiftyBot Algo-Trading System with CLI options.
 
 import logging
 import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
 from data_fetcher import fetch_all_data
 from indicators import add_indicators_to_all
 from strategy import apply_strategy_to_all
-from backtest import backtest_all
-from google_sheets import log_trade_data, log_pnl_data, log_summary_data
-from ml_model import train_model
-from alerts import send_trade_alerts
 from utils import setup_logging
 
+# backtest (numba), ml_model (sklearn) and alerts (aiohttp) are imported inside
+# run_niftybot only when their flag is set, to keep CLI start-up fast
+
 
 def run_niftybot(use_ml=False, use_telegram=False, backtest_mode=False,
                  symbols=None, time_frame=None, period=None, use_dummy=False):
@@ -39,7 +40,8 @@ def run_niftybot(use_ml=False, use_telegram=False, backtest_mode=False,
     backtest_results = {}
     if backtest_mode:
         logging.info("📈 Running backtest...")
-        backtest_results, summaries = backtest_all(data_with_signals)
+        from backtest import backtest_all
+        backtest_results, summaries = backtest_all(data_with_signals, interval=time_frame or "1d")
 
         # Ensure ML Accuracy field exists for all tickers (default '-')
         for ticker in summaries:
@@ -48,8 +50,14 @@ def run_niftybot(use_ml=False, use_telegram=False, backtest_mode=False,
         # Step 5: ML predictions (if enabled)
         if use_ml:
             logging.info("🤖 Training ML models...")
-            for ticker, df in data_with_indicators.items():
-                model, acc, pred_signal = train_model(df)
+            from ml_model import train_model, limit_worker_threads
+            # one single-threaded worker per core (HGB would otherwise start cpu_count OpenMP threads each)
+            with ProcessPoolExecutor(max_workers=min(len(data_with_indicators), os.cpu_count()) or 1,
+                                     initializer=limit_worker_threads) as ex:
+                futures = {ticker: ex.submit(train_model, df)
+                           for ticker, df in data_with_indicators.items()}
+            for ticker, future in futures.items():
+                model, acc, pred_signal = future.result()
                 summaries.setdefault(ticker, {})["ML Accuracy"] = round(acc * 100, 2)
                 summaries[ticker]["ML Prediction"] = pred_signal
                 logging.info(f"{ticker} - ML Accuracy: {acc:.2%} | Next-Day: {pred_signal}")
@@ -58,6 +66,7 @@ def run_niftybot(use_ml=False, use_telegram=False, backtest_mode=False,
     # Step 7: Send Telegram alerts (if enabled)
     if use_telegram:
         logging.info("📢 Sending Telegram alerts...")
+        from alerts import send_trade_alerts
         send_trade_alerts(data_with_signals, lookback_days=1)
 
 
@@ -5,35 +5,39 @@ using only the most relevant features from EDA.
 """
 
 import logging
+import os
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.tree import DecisionTreeClassifier
+from sklearn.ensemble import HistGradientBoostingClassifier
 from sklearn.metrics import accuracy_score, balanced_accuracy_score, classification_report
 from collections import Counter
+from threadpoolctl import threadpool_limits
 
 # Based on feature importance & correlation analysis from EDA
 FEATURE_COLUMNS = ["RSI", "SMA20", "SMA50", "MACD", "MACD_SIGNAL", "Volume"]
 
+def limit_worker_threads():
+    """
+    Process-pool initializer: pin OpenMP/BLAS to one thread per worker, since
+    the pool already runs one training job per core.
+    """
+    os.environ["OMP_NUM_THREADS"] = "1"
+    threadpool_limits(limits=1)
+
 def prepare_ml_data(df):
     """
     Prepare features and labels for ML training using Strategy 2 rules:
       BUY (1): RSI < 30 AND SMA20 > SMA50
       SELL (-1): RSI > 70 AND SMA20 < SMA50
     """
-    df = df.copy()
-
-    # Generate labels
+    # Generate labels (standalone Series, df itself is left untouched)
     buy_cond = (df["RSI"] < 30) & (df["SMA20"] > df["SMA50"])
     sell_cond = (df["RSI"] > 70) & (df["SMA20"] < df["SMA50"])
-
-    df["Label"] = 0
-    df.loc[buy_cond, "Label"] = 1
-    df.loc[sell_cond, "Label"] = -1
+    label = pd.Series(np.select([buy_cond, sell_cond], [1, -1], default=0), index=df.index, name="Label")
 
     # Select features
-    X = df[FEATURE_COLUMNS].copy().ffill().fillna(0)
-    y = df["Label"]
+    X = df[FEATURE_COLUMNS].ffill().fillna(0)
+    y = label
 
     # Remove non-signal rows (Label == 0)
     mask = y != 0
@@ -43,7 +47,7 @@ def prepare_ml_data(df):
 
 def train_model(df):
     """
-    Train Decision Tree model based on filtered strategy signals.
+    Train a histogram gradient-boosting model based on filtered strategy signals.
     Returns: model, balanced_accuracy, next_signal
     """
     X, y = prepare_ml_data(df)
@@ -52,13 +56,17 @@ def train_model(df):
         logging.warning("⚠️ No BUY/SELL signals found in dataset for training.")
         return None, 0, None
 
-    # Train-test split (time-series safe: no shuffling)
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, shuffle=False
-    )
-
-    # Model: Simple & interpretable
-    model = DecisionTreeClassifier(max_depth=5, random_state=42)
+    # Train-test split (time-series safe: last 20% held out, same sizes as train_test_split(shuffle=False))
+    split = len(X) - int(np.ceil(len(X) * 0.2))
+    X_train = X.iloc[:split].to_numpy(dtype=np.float32)
+    X_test = X.iloc[split:].to_numpy(dtype=np.float32)
+    y_train, y_test = y.iloc[:split].to_numpy(), y.iloc[split:].to_numpy()
+
+    # Model: histogram-binned boosted trees (fast native splits, shallow like before)
+    # Signal sets are tiny (often <25 rows), so allow single-sample leaves -- the default of 20 forbids any split.
+    # early_stopping="auto" only kicks in for >10k samples; small signal sets can't spare a validation split
+    model = HistGradientBoostingClassifier(max_depth=5, max_iter=100, min_samples_leaf=1,
+                                           early_stopping="auto", random_state=42)
     model.fit(X_train, y_train)
 
     # Predictions & metrics
@@ -67,7 +75,7 @@ def train_model(df):
     bal_acc = balanced_accuracy_score(y_test, y_pred)
 
     logging.info(f"📊 Accuracy: {acc*100:.2f}% | Balanced Accuracy: {bal_acc*100:.2f}%")
-    logging.info(f"📊 Test Set Class Distribution: {Counter(y_test)}")
+    logging.info(f"📊 Test Set Class Distribution: {Counter(y_test.tolist())}")
     logging.info("\n" + classification_report(y_test, y_pred, digits=2))
 
     # Predict next-day movement
@@ -79,7 +87,7 @@ def predict_next_day(model, last_row):
     """
     Predict next-day BUY/SELL signal based on last available indicators.
     """
-    X_last = last_row[FEATURE_COLUMNS].ffill().fillna(0).values.reshape(1, -1)
+    X_last = last_row[FEATURE_COLUMNS].ffill().fillna(0).to_numpy(dtype=np.float32).reshape(1, -1)
     pred = model.predict(X_last)[0]
     return "BUY" if pred == 1 else "SELL"
 
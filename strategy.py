@@ -3,9 +3,11 @@ strategy.py
 Implements trading strategy (RSI + SMA crossover) and saves signals for backtesting.
 """
 
+import argparse
+import numpy as np
 import pandas as pd
 import logging
-from data_fetcher import fetch_all_data
+from data_fetcher import fetch_all_data, save_parquet_dir
 from indicators import add_indicators_to_all
 from config import TICKERS
 
@@ -16,16 +18,17 @@ def apply_strategy(df):
     Apply RSI < 30 and SMA20 > SMA50 for BUY.
     RSI > 70 and SMA20 < SMA50 for SELL.
     Else HOLD.
+    Signal is stored as int8: 1 = BUY, -1 = SELL, 0 = HOLD.
     """
-    df["Signal"] = "HOLD"
+    df["Signal"] = np.zeros(len(df), dtype=np.int8)
 
     # BUY condition
     buy_cond = (df["RSI"] < 30) & (df["SMA20"] > df["SMA50"])
-    df.loc[buy_cond, "Signal"] = "BUY"
+    df.loc[buy_cond, "Signal"] = 1
 
     # SELL condition
     sell_cond = (df["RSI"] > 70) & (df["SMA20"] < df["SMA50"])
-    df.loc[sell_cond, "Signal"] = "SELL"
+    df.loc[sell_cond, "Signal"] = -1
 
     return df
 
@@ -39,10 +42,25 @@ def apply_strategy_to_all(data_dict):
         logging.info(f"✅ Signals generated for {ticker} ({df_with_signals['Signal'].value_counts().to_dict()})")
     return updated_data
 
+def save_signals_to_excel(data_dict, output_file="nifty_data_with_signals.xlsx"):
+    """
+    Export {ticker: DataFrame} to one Excel sheet per ticker for manual review.
+    Uses the xlsxwriter engine, which needs less memory than openpyxl. Its
+    constant_memory mode can't be used: to_excel writes column by column.
+    """
+    with pd.ExcelWriter(output_file, engine="xlsxwriter") as writer:
+        for ticker, df in data_dict.items():
+            df.to_excel(writer, sheet_name=ticker, index=True)
+    logging.info(f"💾 Strategy output exported to {output_file}")
+
 if __name__ == "__main__":
-    # 1. Fetch raw data (dummy or real)
-    logging.info("📂 Loading local dataset from nifty_data.xlsx ...")
-    raw_data = pd.read_excel("nifty_data.xlsx", sheet_name=None)  # dict of DataFrames
+    parser = argparse.ArgumentParser(description="Generate strategy signals for backtesting")
+    parser.add_argument("--excel", action="store_true",
+                        help="Also export signals to nifty_data_with_signals.xlsx")
+    args = parser.parse_args()
+
+    # 1. Load raw data (Parquet cache of nifty_data.xlsx, rebuilt when the workbook changes)
+    raw_data = fetch_all_data(use_local=True)
 
     # 2. Add indicators
     data_with_indicators = add_indicators_to_all(raw_data)
@@ -51,8 +69,6 @@ if __name__ == "__main__":
     data_with_signals = apply_strategy_to_all(data_with_indicators)
 
     # 4. Save output for backtesting
-    output_file = "nifty_data_with_signals.xlsx"
-    with pd.ExcelWriter(output_file) as writer:
-        for ticker, df in data_with_signals.items():
-            df.to_excel(writer, sheet_name=ticker, index=True)
-    logging.info(f"💾 Strategy output saved to {output_file}")
+    save_parquet_dir(data_with_signals, "data/signals")
+    if args.excel:
+        save_signals_to_excel(data_with_signals)